@@ -5,13 +5,53 @@
 # Example:
 # N2YO_API_KEY = "YOUR_API_KEY_HERE"
 # -------------------------------------------------------------
-from flask import Flask, render_template, request, redirect, url_for
+# Cooperative sockets for the gevent worker (gunicorn -k gevent): patching
+# must happen before requests/urllib3 are imported so their socket calls
+# yield instead of blocking the worker. Falls back to a no-op under the
+# plain dev server when gevent isn't installed.
+try:
+    from gevent import monkey
+    monkey.patch_all()
+except ImportError:
+    pass
+
+from flask import Flask, render_template, request, redirect, url_for, jsonify, send_from_directory
+from flask_compress import Compress
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import folium
 from folium.plugins import Terminator
 import data_fetcher
+import hashlib
+import json
 import os
 
 app = Flask(__name__)
+Compress(app)  # gzip/br for HTML/JSON responses — the map page compresses ~5x
+
+
+@app.after_request
+def _cache_map_html(response):
+    # The generated map only changes when the quantized cells change, so let
+    # browsers keep it for a minute instead of re-downloading per page load.
+    if request.path == "/map" or request.path.startswith("/static/iss_map"):
+        response.headers["Cache-Control"] = "public, max-age=60"
+    return response
+
+
+@app.route("/map")
+def map_page():
+    """
+    Serve the generated map with conditional-request support: unchanged
+    content answers If-Modified-Since / ETag checks with an empty 304
+    instead of resending the whole page.
+    """
+    response = send_from_directory("static", "iss_map.html", conditional=True)
+    # send_from_directory streams the file, which Flask-Compress skips —
+    # buffer the body into the response so the map HTML gets gzipped too
+    response.direct_passthrough = False
+    response.set_data(response.get_data())
+    return response
 
 # --- N2YO API Key ---
 N2YO_API_KEY = "YOUR_API_KEY_HERE"
@@ -20,6 +60,151 @@ N2YO_API_KEY = "YOUR_API_KEY_HERE"
 USE_SIMULATED_PASSES = False # ← you can manually change this anytime
 
 
+def _quantize_half_deg(value):
+    """Round a coordinate to 0.5° cells (~30 km at ISS speed: a few seconds)."""
+    if value is None:
+        return None
+    return round(value * 2) / 2
+
+
+# --- Pre-rendered base map (tile layers + Terminator + layer control) ---
+# These parts are identical for every request; only the center and the two
+# markers vary. Render them through folium's Jinja templates once at import
+# and splice the dynamic pieces in as strings per request.
+_CENTER_SENTINEL = [-87.654321, -123.456789]
+
+
+def _render_base_map():
+    # Initialize map (no default tiles so we can add our own)
+    base_map = folium.Map(location=_CENTER_SENTINEL, zoom_start=3, tiles=None)
+
+    # Add multiple tile layers
+    folium.TileLayer(
+        tiles='CartoDB dark_matter',
+        name='Dark Map',
+        attr='&copy; OpenStreetMap contributors &copy; CARTO'
+    ).add_to(base_map)
+
+    folium.TileLayer(
+        tiles='CartoDB positron',
+        name='Light Map',
+        attr='&copy; OpenStreetMap contributors &copy; CARTO'
+    ).add_to(base_map)
+
+    # Add Satellite imagery (Esri)
+    folium.TileLayer(
+        tiles='https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}',
+        attr='Tiles &copy; Esri',
+        name='Satellite View (Esri)'
+    ).add_to(base_map)
+
+    # Add Day/Night Terminator (toggleable)
+    terminator_group = folium.FeatureGroup(name="Day / Night Line", show=False)
+    Terminator().add_to(terminator_group)
+    terminator_group.add_to(base_map)
+
+    # Add toggle control for layers
+    folium.LayerControl(collapsed=False).add_to(base_map)
+
+    return base_map.get_root().render(), base_map.get_name()
+
+
+_BASE_MAP_HTML, _BASE_MAP_VAR = _render_base_map()
+_CENTER_TOKEN = json.dumps(_CENTER_SENTINEL)
+
+
+def _marker_js(name, lat, lon, color, icon, popup_html, tooltip):
+    """Leaflet JS for one marker, spliced into the pre-rendered base map."""
+    icon_opts = json.dumps({
+        "markerColor": color, "iconColor": "white",
+        "icon": icon, "prefix": "fa", "extraClasses": "fa-rotate-0"
+    })
+    return (
+        f"\n            var {name} = L.marker([{lat}, {lon}]).addTo({_BASE_MAP_VAR});\n"
+        f"            {name}.setIcon(L.AwesomeMarkers.icon({icon_opts}));\n"
+        f"            {name}.bindPopup({json.dumps(popup_html)});\n"
+        f"            {name}.bindTooltip({json.dumps(tooltip)});\n"
+    )
+
+
+@lru_cache(maxsize=256)
+def _build_map_html(user_lat, user_lon, iss_lat, iss_lon, full_address, place_name):
+    """
+    Produce the map HTML for the given (quantized) coordinates. The static
+    scaffolding (tile layers, Terminator, layer control) comes from the base
+    rendered once at import; only the map center and the two markers are
+    stitched in here, and the result is memoized — same cells in, same HTML
+    out, no re-render. Persistence is _save_map_html's job.
+    """
+    if iss_lat is not None and iss_lon is not None:
+        map_center = [(user_lat + iss_lat) / 2, (user_lon + iss_lon) / 2]
+    else:
+        map_center = [user_lat, user_lon]
+
+    # User location marker
+    markers_js = _marker_js(
+        "user_marker", user_lat, user_lon, 'blue', 'user',
+        f"<b>Your Location:</b><br>{full_address}", "Your Location"
+    )
+
+    # ISS marker (if available), kept live client-side by polling /api/iss —
+    # the server never re-renders the map just because the ISS moved.
+    if iss_lat and iss_lon:
+        markers_js += _marker_js(
+            "iss_marker", iss_lat, iss_lon, 'red', 'satellite',
+            f"<b>ISS Current Position:</b><br>{place_name}", "ISS Position"
+        )
+        markers_js += (
+            "\n            setInterval(function () {\n"
+            "                fetch(\"/api/iss\").then(function (r) { return r.json(); })\n"
+            "                    .then(function (d) {\n"
+            "                        if (d.latitude !== null && d.longitude !== null) {\n"
+            "                            iss_marker.setLatLng([d.latitude, d.longitude]);\n"
+            "                        }\n"
+            "                    });\n"
+            "            }, 5000);\n"
+        )
+
+    map_html = _BASE_MAP_HTML.replace(_CENTER_TOKEN, json.dumps(map_center), 1)
+    script_end = map_html.rfind("</script>")
+    return map_html[:script_end] + markers_js + map_html[script_end:]
+
+
+# Key of the map this process last saved to static/iss_map.html — lets
+# requests for unchanged (quantized) coordinates skip the disk write.
+_LAST_MAP_KEY = None
+
+
+def _save_map_html(map_key, map_html):
+    global _LAST_MAP_KEY
+    map_file = os.path.join("static", "iss_map.html")
+    if map_key == _LAST_MAP_KEY:
+        # The key is per-process but the file is shared between gunicorn
+        # workers, so another worker may have overwritten it since we last
+        # wrote — only skip the write if the content on disk really is ours.
+        try:
+            with open(map_file, encoding="utf-8") as f:
+                if f.read() == map_html:
+                    return
+        except OSError:
+            pass
+    if not os.path.exists("static"):
+        os.makedirs("static")
+    with open(map_file, "w", encoding="utf-8") as f:
+        f.write(map_html)
+    _LAST_MAP_KEY = map_key
+
+
+@app.route("/api/iss")
+def api_iss():
+    """
+    Tiny JSON endpoint polled by the map page so the ISS marker moves
+    client-side instead of the server re-rendering the map.
+    """
+    lat, lon = data_fetcher.get_iss_position()
+    return jsonify({"latitude": lat, "longitude": lon})
+
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     if request.method == "POST":
@@ -32,80 +217,44 @@ def index():
         if not user_lat:
             return render_template("index.html", error=f"Could not find location for '{user_city}'.")
 
-        # Fetch pass data
-        if USE_SIMULATED_PASSES:
-            pass_times = data_fetcher.get_iss_passes(N2YO_API_KEY, user_lat, user_lon, USE_REAL_API=False)
-        else:
-            pass_times = data_fetcher.get_iss_passes(N2YO_API_KEY, user_lat, user_lon)
-
-        # Get live ISS position
-        iss_lat, iss_lon = data_fetcher.get_iss_position()
-        place_name = data_fetcher.get_place_name(iss_lat, iss_lon) if iss_lat else "Unavailable (Network Error)"
-
-        # Collision estimation + astronauts
-        collision_risks = data_fetcher.get_collision_risks()
-        astro_count, astro_names = data_fetcher.get_astronauts()
-
-               # --- Create & Save Folium Map (improved with Satellite + Day/Night toggle) ---
-        if iss_lat is not None and iss_lon is not None:
-            map_center = [(user_lat + iss_lat) / 2, (user_lon + iss_lon) / 2]
-        else:
-            map_center = [user_lat, user_lon]
-
-        # Initialize map (no default tiles so we can add our own)
-        main_map = folium.Map(location=map_center, zoom_start=3, tiles=None)
-
-        # Add multiple tile layers
-        folium.TileLayer(
-            tiles='CartoDB dark_matter',
-            name='Dark Map',
-            attr='&copy; OpenStreetMap contributors &copy; CARTO'
-        ).add_to(main_map)
-
-        folium.TileLayer(
-            tiles='CartoDB positron',
-            name='Light Map',
-            attr='&copy; OpenStreetMap contributors &copy; CARTO'
-        ).add_to(main_map)
-
-        # Add Satellite imagery (Esri)
-        folium.TileLayer(
-            tiles='https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}',
-            attr='Tiles &copy; Esri',
-            name='Satellite View (Esri)'
-        ).add_to(main_map)
-
-        # Add Day/Night Terminator (toggleable)
-        terminator_group = folium.FeatureGroup(name="Day / Night Line", show=False)
-        Terminator().add_to(terminator_group)
-        terminator_group.add_to(main_map)
-
-        # User location marker
-        folium.Marker(
-            [user_lat, user_lon],
-            popup=f"<b>Your Location:</b><br>{full_address}",
-            tooltip="Your Location",
-            icon=folium.Icon(color='blue', icon='user', prefix='fa')
-        ).add_to(main_map)
-
-        # ISS marker (if available)
-        if iss_lat and iss_lon:
-            place_name = data_fetcher.get_place_name(iss_lat, iss_lon)
-            folium.Marker(
-                [iss_lat, iss_lon],
-                popup=f"<b>ISS Current Position:</b><br>{place_name}",
-                tooltip="ISS Position",
-                icon=folium.Icon(color='red', icon='satellite', prefix='fa')
-            ).add_to(main_map)
-
-        # Add toggle control for layers
-        folium.LayerControl(collapsed=False).add_to(main_map)
-
-        # Save map to static file
-        if not os.path.exists("static"):
-            os.makedirs("static")
-        map_file = os.path.join("static", "iss_map.html")
-        main_map.save(map_file)
+        # Fan out the independent upstream fetches (N2YO, wheretheiss.at,
+        # open-notify, collision model) so total wait ≈ the slowest call
+        # instead of the sum of all of them.
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            f_passes = executor.submit(
+                data_fetcher.get_iss_passes, N2YO_API_KEY, user_lat, user_lon,
+                USE_REAL_API=not USE_SIMULATED_PASSES
+            )
+            f_position = executor.submit(data_fetcher.get_iss_position)
+            f_collisions = executor.submit(data_fetcher.get_collision_risks)
+            f_astronauts = executor.submit(data_fetcher.get_astronauts)
+
+            # Reverse geocoding depends on the ISS position, so submit it
+            # once the position future resolves.
+            iss_lat, iss_lon = f_position.result()
+            if iss_lat is not None:
+                f_place = executor.submit(data_fetcher.get_place_name, iss_lat, iss_lon)
+                place_name = f_place.result()
+            else:
+                place_name = "Unavailable (Network Error)"
+
+            pass_times = f_passes.result()
+            collision_risks = f_collisions.result()
+            astro_count, astro_names = f_astronauts.result()
+
+        # --- Create & Save Folium Map (improved with Satellite + Day/Night toggle) ---
+        # Coordinates are quantized so that nearby requests reuse the cached
+        # rendered HTML instead of re-serializing the whole map, and the disk
+        # write is skipped when the saved map already matches this key.
+        map_key = (
+            round(user_lat, 3), round(user_lon, 3),
+            _quantize_half_deg(iss_lat), _quantize_half_deg(iss_lon),
+            full_address, place_name
+        )
+        _save_map_html(map_key, _build_map_html(*map_key))
+        # Version the iframe URL with the map key so a new search gets a new
+        # URL (fresh fetch) while an unchanged map stays browser-cached.
+        map_version = hashlib.md5(repr(map_key).encode()).hexdigest()[:8]
 
         # Build data for the results page
         result_data = {
@@ -116,6 +265,7 @@ def index():
             "astro_count": astro_count,
             "astro_names": astro_names,
             "collision_risks": collision_risks,
+            "map_version": map_version,
             "api_count": "—"  # optional placeholder for future tracking
         }
 
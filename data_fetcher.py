@@ -1,10 +1,104 @@
 # data_fetcher.py
 from datetime import datetime, timedelta, timezone
 from dateutil import tz
+from functools import lru_cache
 from geopy.geocoders import Nominatim
+from geopy.extra.rate_limiter import RateLimiter
+import numpy as np
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import math
 import random
+import time
+
+# -----------------------------
+#  Shared HTTP session (connection pooling + keep-alive)
+# -----------------------------
+# One pooled session for all outbound API calls so repeated requests to the
+# same host (wheretheiss.at, n2yo.com, open-notify.org) reuse the TCP/TLS
+# connection instead of paying a fresh handshake each time.
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+_SESSION.headers.update({"User-Agent": "iss_tracker/1.0", "Accept-Encoding": "gzip"})
+
+# -----------------------------
+#  Shared Nominatim geocoder (rate-limited)
+# -----------------------------
+# A single geocoder instance with a generous timeout — Nominatim's public
+# endpoint has a slow tail, and short timeouts just trigger retry storms.
+# RateLimiter keeps us inside the 1 req/s usage policy and retries with a
+# small wait instead of hammering while OSM is slow. Errors are left to
+# raise (not swallowed) so the lru_cache layers above never memoize a
+# transient failure as a permanent miss.
+_GEOCODER = Nominatim(user_agent="iss_tracker_project/1.0 (contact@example.com)", timeout=15)
+_reverse_limited = RateLimiter(_GEOCODER.reverse, min_delay_seconds=1, max_retries=2,
+                               error_wait_seconds=2.0, swallow_exceptions=False)
+_geocode_limited = RateLimiter(_GEOCODER.geocode, min_delay_seconds=1, max_retries=2,
+                               error_wait_seconds=2.0, swallow_exceptions=False)
+
+# -----------------------------
+#  Fallback ocean-region lookup grid
+# -----------------------------
+# 1°x1° grid of region codes, filled once at import from the old if/elif
+# predicates. Lookup is then a single array index instead of a comparison
+# ladder, and building the grid with "first region wins" priority fixes the
+# old overlap where the North Pacific range was shadowed by the wider South
+# Pacific one.
+_OCEAN_NAMES = [
+    "Over an unknown area",
+    "Over the Indian Ocean",
+    "Over the North Pacific Ocean",
+    "Over the South Pacific Ocean",
+    "Over the North Atlantic Ocean",
+    "Over the South Atlantic Ocean",
+    "Over the Polar Region",
+]
+
+def _build_ocean_grid():
+    lat = np.arange(-90, 90, dtype=np.float32)[:, None]
+    lon = np.arange(-180, 180, dtype=np.float32)[None, :]
+    regions = [
+        (1, (lat >= -60) & (lat <= 30) & (lon >= 20) & (lon <= 150)),
+        (2, (lat >= 0) & (lat <= 60) & (lon >= -180) & (lon <= -100)),
+        (3, (lat >= -60) & (lat <= 60) & (lon >= -180) & (lon <= -70)),
+        (4, (lat >= 0) & (lon >= -100) & (lon <= -20)),
+        (5, (lat < 0) & (lon >= -70) & (lon <= 20)),
+        (6, np.abs(lat) > 60),
+    ]
+    grid = np.zeros((180, 360), dtype=np.uint8)
+    for code, cond in regions:
+        mask = np.broadcast_to(cond, grid.shape) & (grid == 0)
+        grid[mask] = code
+    return grid
+
+_OCEAN_GRID = _build_ocean_grid()
+
+def _ocean_at(latitude, longitude):
+    """O(1) fallback region label for coordinates Nominatim couldn't resolve."""
+    # floor, not int(): truncation toward zero would fold the -1°..0° band
+    # onto the 0° row and mislabel southern-hemisphere cells near the equator
+    i = min(max(math.floor(latitude) + 90, 0), 179)
+    j = min(max(math.floor(longitude) + 180, 0), 359)
+    return _OCEAN_NAMES[_OCEAN_GRID[i, j]]
+
+# -----------------------------
+#  Helper: TTL bucket for lru_cache keys
+# -----------------------------
+def _ttl_bucket(seconds):
+    """
+    Return the current time quantized to `seconds`-wide buckets.
+    Passing this as an lru_cache key gives the cached value a simple
+    time-to-live: a new bucket means a fresh upstream fetch.
+    """
+    return int(time.time() // seconds)
 
 # -----------------------------
 #  Helper: format datetime nicely
@@ -20,81 +114,93 @@ def get_iss_position(timeout=8):
     """
     Uses whereetheiss.at (no API key) to get current ISS lat/lon.
     Returns (lat, lon) or (None, None) on failure.
+    Cached for 5 s — the ISS moves ~4 km/s, so a 5 s old fix is still accurate
+    and repeated page hits within the window skip the network entirely.
     """
-    api_url = "https://api.wheretheiss.at/v1/satellites/25544"
     try:
-        r = requests.get(api_url, timeout=timeout)
-        r.raise_for_status()
-        data = r.json()
-        return float(data.get("latitude")), float(data.get("longitude"))
+        return _iss_position_cached(_ttl_bucket(5), timeout)
     except requests.exceptions.RequestException as e:
         print(f"⚠ Error fetching ISS position: {e}")
         return None, None
 
+@lru_cache(maxsize=1)
+def _iss_position_cached(bucket, timeout):
+    # request errors raise out of here so lru_cache never stores a failure
+    api_url = "https://api.wheretheiss.at/v1/satellites/25544"
+    r = _SESSION.get(api_url, timeout=timeout)
+    r.raise_for_status()
+    data = orjson.loads(r.content)
+    return float(data.get("latitude")), float(data.get("longitude"))
+
 # -----------------------------
 #  Reverse geocode place name
 # -----------------------------
-def get_place_name(latitude, longitude, timeout=10):
+def get_place_name(latitude, longitude):
     """
     Convert lat/lon to a readable place name or ocean region.
     Returns a string (city, region or ocean).
+    Coordinates are quantized to ~0.1° cells and memoized, so nearby points
+    (a stationary user, or the ISS re-crossing a cell) reuse the Nominatim
+    answer instead of paying another round-trip.
     """
     try:
-        geolocator = Nominatim(user_agent="iss_tracker_project", timeout=timeout)
-        location = geolocator.reverse((latitude, longitude), exactly_one=True, language='en')
-        if location:
-            address = location.raw.get('address', {})
-            # prefer ocean/sea keys first
-            for key in ['ocean', 'sea', 'water', 'bay']:
-                if key in address:
-                    return f"Over the {address[key]}"
-            city = address.get('city') or address.get('town') or address.get('village') or address.get('municipality')
-            state = address.get('state')
-            country = address.get('country')
-            if city and country:
-                return f"{city}, {country}"
-            if state and country:
-                return f"{state}, {country}"
-            if country:
-                return country
-        # fallback ocean/region guesses
-        lat, lon = latitude, longitude
-        if -60 <= lat <= 30 and 20 <= lon <= 150:
-            return "Over the Indian Ocean"
-        elif -60 <= lat <= 60 and -180 <= lon <= -70:
-            return "Over the South Pacific Ocean"
-        elif 0 <= lat <= 60 and -180 <= lon <= -100:
-            return "Over the North Pacific Ocean"
-        elif lat >= 0 and -100 <= lon <= -20:
-            return "Over the North Atlantic Ocean"
-        elif lat < 0 and -70 <= lon <= 20:
-            return "Over the South Atlantic Ocean"
-        elif abs(lat) > 60:
-            return "Over the Polar Region"
-        else:
-            return "Over an unknown area"
+        return _reverse_cached(round(latitude * 10), round(longitude * 10))
     except Exception as e:
         print(f"⚠ Reverse geocoding error: {e}")
         return "Location not available"
 
+@lru_cache(maxsize=4096)
+def _reverse_cached(lat_q, lon_q):
+    # Network errors raise out of here, so lru_cache never stores them —
+    # only real answers (an address or the ocean-grid fallback) are memoized.
+    return _reverse_uncached(lat_q / 10.0, lon_q / 10.0)
+
+def _reverse_uncached(latitude, longitude):
+    location = _reverse_limited((latitude, longitude), exactly_one=True, language='en')
+    if location:
+        address = location.raw.get('address', {})
+        # prefer ocean/sea keys first
+        for key in ['ocean', 'sea', 'water', 'bay']:
+            if key in address:
+                return f"Over the {address[key]}"
+        city = address.get('city') or address.get('town') or address.get('village') or address.get('municipality')
+        state = address.get('state')
+        country = address.get('country')
+        if city and country:
+            return f"{city}, {country}"
+        if state and country:
+            return f"{state}, {country}"
+        if country:
+            return country
+    # fallback ocean/region guess from the precomputed grid
+    return _ocean_at(latitude, longitude)
+
 # -----------------------------
 #  Geocode city -> lat/lon
 # -----------------------------
-def get_coords_from_city(city_name, timeout=10):
+def get_coords_from_city(city_name):
     """
     Return (lat, lon, full_address) or (None, None, None).
-    Uses Nominatim (OpenStreetMap).
+    Uses Nominatim (OpenStreetMap) via the shared rate-limited geocoder.
+    Lookups are memoized on the normalized city name — the same few cities
+    dominate traffic, and a repeat search costs a dict hit instead of a
+    ~1 s Nominatim round-trip.
     """
     try:
-        geolocator = Nominatim(user_agent="iss_tracker_project", timeout=timeout)
-        location = geolocator.geocode(city_name)
-        if location:
-            return (location.latitude, location.longitude, location.address)
-        return (None, None, None)
+        return _geocode_cached(city_name.strip().casefold())
     except Exception as e:
         print(f"⚠ Geocoding error: {e}")
         return (None, None, None)
 
+@lru_cache(maxsize=10_000)
+def _geocode_cached(normalized_city):
+    # Network errors raise out of here, so lru_cache never stores them —
+    # only real answers (found or genuinely unknown city) are memoized.
+    location = _geocode_limited(normalized_city)
+    if location:
+        return (location.latitude, location.longitude, location.address)
+    return (None, None, None)
+
 # -------------------------------------------------------------------------
 # SIMULATED PASS GENERATOR
 # Used for testing the application without consuming N2YO API requests limits.
@@ -106,64 +212,59 @@ def get_coords_from_city(city_name, timeout=10):
 # Generates realistic ISS pass timestamps for safe, offline development.
 # -------------------------------------------------------------------------
 def _simulated_passes(number=3, start_utc=None, seed=None):
-     
-    if seed is not None:
-        random.seed(seed)
-    else:
-        random.seed()
+
+    rng = np.random.default_rng(seed)
 
     if start_utc is None:
         now = datetime.utcnow().replace(tzinfo=timezone.utc)
     else:
         now = start_utc if isinstance(start_utc, datetime) else datetime.utcnow().replace(tzinfo=timezone.utc)
 
-    day_gap_choices = [1, 1, 2, 2, 3, 4]  # common gaps between visible passes (makes varied spacing)
-    passes = []
-    current_date = now
-
-    # start preference: more likely evening or morning (bias random)
-    is_evening = random.random() < 0.65
+    # Draw every random quantity in one batched call per kind, then assemble
+    # the dicts at the end — O(1) RNG calls regardless of pass count.
+    day_gaps = rng.choice([1, 1, 2, 2, 3, 4], size=number)  # common gaps between visible passes (makes varied spacing)
+    day_offsets = np.cumsum(day_gaps)
 
-    for i in range(number):
-        gap = random.choice(day_gap_choices)
-        current_date = current_date + timedelta(days=gap)
+    # start preference: more likely evening or morning (bias random), with
+    # occasional period switches carried forward as a cumulative toggle
+    start_evening = rng.random() < 0.65
+    switches = rng.random(number) >= 0.15
+    is_evening = (int(start_evening) + np.cumsum(switches)) % 2 == 1
 
-        # occasionally switch period
-        if random.random() >= 0.15:
-            is_evening = not is_evening
+    # pick hours in evening (6 PM - 11 PM) or morning (4 AM - 7 AM) windows
+    hours = np.where(is_evening, rng.integers(18, 24, size=number),
+                     rng.integers(4, 8, size=number))
+    minutes = rng.integers(0, 60, size=number)
+    seconds = rng.integers(0, 60, size=number)
 
-        # pick hour in evening or morning windows
-        if is_evening:
-            hour = random.randint(18, 23)   # 6 PM - 11 PM
-        else:
-            hour = random.randint(4, 7)     # 4 AM - 7 AM
+    # plausible max elevation and duration values
+    max_elevs = np.round(np.clip(rng.normal(45, 15, size=number), 10.0, 85.0), 1)
+    durations = np.clip((120 + max_elevs * 6 + rng.integers(-60, 61, size=number)).astype(int), 120, 900)
 
-        minute = random.randint(0, 59)
-        second = random.randint(0, 59)
+    local_tz = tz.gettz()
+    passes = []
+    for offset, hour, minute, second, max_elev, duration in zip(
+            day_offsets, hours, minutes, seconds, max_elevs, durations):
+        pass_date = now + timedelta(days=int(offset))
 
         # UTC pass time constructed using chosen hour/minute/second
         pass_dt_utc = datetime(
-            year=current_date.year,
-            month=current_date.month,
-            day=current_date.day,
-            hour=hour, minute=minute, second=second,
+            year=pass_date.year,
+            month=pass_date.month,
+            day=pass_date.day,
+            hour=int(hour), minute=int(minute), second=int(second),
             tzinfo=timezone.utc
         )
 
         # Convert UTC -> local system timezone (so displayed times match system / IST if your laptop is IST)
-        local_tz = tz.gettz()
         pass_dt_local = pass_dt_utc.astimezone(local_tz)
 
-        # Build a plausible duration and max elevation value
-        max_elev = round(min(85.0, max(10.0, random.gauss(45, 15))), 1)
-        duration = int(max(120, min(900, int(120 + max_elev * 6 + random.randint(-60, 60)))))
-
         passes.append({
             'time': _fmt_pass_dt(pass_dt_local),
             'iso_time_local': pass_dt_local.isoformat(),
             'iso_time_utc': pass_dt_utc.isoformat(),
-            'duration': duration,
-            'max_elev_deg': max_elev,
+            'duration': int(duration),
+            'max_elev_deg': float(max_elev),
             'source': 'simulated'
         })
 
@@ -184,13 +285,13 @@ def get_iss_passes(api_key, lat, lon, number_of_passes=5, USE_REAL_API=True, tim
     api_url = (f"https://api.n2yo.com/rest/v1/satellite/radiopasses/25544/"
                f"{lat}/{lon}/0/{number_of_passes}/300/&apiKey={api_key}")
     try:
-        r = requests.get(api_url, timeout=timeout)
+        r = _SESSION.get(api_url, timeout=timeout)
         # Check for rate-limited/forbidden before raising
         if r.status_code in (403, 429):
             print("⚠ N2YO limit reached or access denied. Falling back to simulated data.")
             return _simulated_passes(number=number_of_passes)
         r.raise_for_status()
-        data = r.json()
+        data = orjson.loads(r.content)
         if not data or 'passes' not in data or not data['passes']:
             print("⚠ No pass data returned from N2YO (empty 'passes'). Falling back to simulated.")
             return _simulated_passes(number=number_of_passes)
@@ -220,46 +321,51 @@ def get_collision_risks(days=3):
     Lightweight simulated conjunction analysis for demonstration (3-day window).
     Produces sorted list of risk events with miss distance, level and tiny probability score.
     This is a simulation only—replace with CelesTrak/SOCRATES calls for real data.
+    Results are cached for 10 minutes; conjunction windows don't change faster.
     """
+    return _collision_risks_cached(_ttl_bucket(600), days)
+
+ISS_ALTITUDE_KM = 408.0
+ISS_INCLINATION_DEG = 51.6
+
+# small set of representative debris/objects for demo; held as structure-of-
+# arrays so the risk math is one vectorized pass even if this grows to a full
+# CelesTrak catalog (~20k objects)
+_DEBRIS_OBJECTS = [
+    {"name": "FENGYUN-1C DEB", "altitude": 850, "inclination": 98.5},
+    {"name": "COSMOS-2251 DEB", "altitude": 790, "inclination": 74.0},
+    {"name": "IRIDIUM-33 DEB", "altitude": 770, "inclination": 86.4},
+    {"name": "ATLAS V R/B", "altitude": 420, "inclination": 51.7},
+    {"name": "STARLINK DEB", "altitude": 550, "inclination": 53.0},
+    {"name": "CZ-2C R/B", "altitude": 430, "inclination": 49.5}
+]
+_DEBRIS_NAMES = [obj["name"] for obj in _DEBRIS_OBJECTS]
+_DEBRIS_ALT = np.array([obj["altitude"] for obj in _DEBRIS_OBJECTS], dtype=np.float32)
+_DEBRIS_INC = np.array([obj["inclination"] for obj in _DEBRIS_OBJECTS], dtype=np.float32)
+
+@lru_cache(maxsize=4)
+def _collision_risks_cached(bucket, days):
     print("🛰 Running simulated conjunction analysis (3-day window)...")
 
-    ISS_ALTITUDE_KM = 408.0
-    ISS_INCLINATION_DEG = 51.6
-
-    # small set of representative debris/objects for demo
-    debris_objects = [
-        {"name": "FENGYUN-1C DEB", "altitude": 850, "inclination": 98.5},
-        {"name": "COSMOS-2251 DEB", "altitude": 790, "inclination": 74.0},
-        {"name": "IRIDIUM-33 DEB", "altitude": 770, "inclination": 86.4},
-        {"name": "ATLAS V R/B", "altitude": 420, "inclination": 51.7},
-        {"name": "STARLINK DEB", "altitude": 550, "inclination": 53.0},
-        {"name": "CZ-2C R/B", "altitude": 430, "inclination": 49.5}
-    ]
+    altitude_diff = np.abs(_DEBRIS_ALT - ISS_ALTITUDE_KM)
+    # scale inclination diff to km-equivalent (small heuristic)
+    inc_diff = np.abs(_DEBRIS_INC - ISS_INCLINATION_DEG)
+    distance = np.sqrt(altitude_diff**2 + (inc_diff * 10)**2)
+    level = np.where(distance < 10, "High", np.where(distance < 30, "Medium", "Low"))
+    # gaussian-like small probability scaled for demo readability
+    Pc = np.exp(-(distance**2) / (2 * (20.0**2))) * 1e-3
 
     now = datetime.utcnow()
     risks = []
-    for obj in debris_objects:
-        altitude_diff = abs(obj["altitude"] - ISS_ALTITUDE_KM)
-        inc_diff = abs(obj["inclination"] - ISS_INCLINATION_DEG)
-        # scale inclination diff to km-equivalent (small heuristic)
-        distance = math.sqrt(altitude_diff*2 + (inc_diff * 10)*2)
-        if distance < 10:
-            level = "High"
-        elif distance < 30:
-            level = "Medium"
-        else:
-            level = "Low"
-        # gaussian-like small probability scaled for demo readability
-        Pc = math.exp(-(distance*2) / (2 * (20*2))) * 1e-3
-        Pc = round(Pc, 6)
+    for obj_name, obj_dist, obj_level, obj_pc in zip(_DEBRIS_NAMES, distance, level, Pc):
         event_time = now + timedelta(hours=random.randint(6, max(6, days * 24)))
         event_str = event_time.strftime("On %A, %b %d at %I:%M %p UTC")
         risks.append({
-            "object_name": obj["name"],
-            "miss_distance_km": round(distance, 2),
+            "object_name": obj_name,
+            "miss_distance_km": round(float(obj_dist), 2),
             "time": event_str,
-            "level": level,
-            "probability": Pc,
+            "level": str(obj_level),
+            "probability": round(float(obj_pc), 6),
             "simulated": True
         })
     risks.sort(key=lambda x: x["miss_distance_km"])
@@ -271,15 +377,21 @@ def get_collision_risks(days=3):
 def get_astronauts(timeout=6):
     """
     Returns (number_of_people, [names]) or (None, []) on failure.
+    Cached for 1 hour — the crew roster changes on the scale of weeks.
     """
-    api_url = 'http://api.open-notify.org/astros.json'
     try:
-        r = requests.get(api_url, timeout=timeout)
-        r.raise_for_status()
-        data = r.json()
-        number_of_people = data.get('number')
-        names = [person['name'] for person in data.get('people', [])]
-        return number_of_people, names
+        return _astronauts_cached(_ttl_bucket(3600), timeout)
     except requests.exceptions.RequestException as e:
         print(f"⚠ Astronaut data error: {e}")
-        return None, []
\ No newline at end of file
+        return None, []
+
+@lru_cache(maxsize=1)
+def _astronauts_cached(bucket, timeout):
+    # request errors raise out of here so lru_cache never stores a failure
+    api_url = 'http://api.open-notify.org/astros.json'
+    r = _SESSION.get(api_url, timeout=timeout)
+    r.raise_for_status()
+    data = orjson.loads(r.content)
+    number_of_people = data.get('number')
+    names = [person['name'] for person in data.get('people', [])]
+    return number_of_people, names
\ No newline at end of file